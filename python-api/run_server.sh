@@ -5,6 +5,40 @@ source yt-env/bin/activate
 # Set temp dir
 #export TWITTER_DOWNLOADER_TEMP_DIR="/home/ubuntu/video_downloads"
 
+# Optional RAM-backed staging tier (spills over to the temp dir when full)
+#export TWITTER_DOWNLOADER_STAGING_DIR="/dev/shm/twitter_downloader"
+#export TWITTER_DOWNLOADER_STAGING_MAX_MB=256
+#export TWITTER_DOWNLOADER_STAGING_RESERVE_MB=64
+#export TWITTER_DOWNLOADER_FILE_MAX_AGE_MINUTES=30
+
+# Optional nginx X-Accel-Redirect offload for delivery="file" downloads
+#export TWITTER_DOWNLOADER_ACCEL_PREFIX="/protected/video_downloads"
+#export TWITTER_DOWNLOADER_STAGING_ACCEL_PREFIX="/protected/staging"
+
+# ffmpeg used for audio-only downloads (default: ffmpeg on PATH)
+#export TWITTER_DOWNLOADER_FFMPEG="/usr/bin/ffmpeg"
+
+# Optional speculative prefetch of the default choice after /extract
+#export TWITTER_DOWNLOADER_PREFETCH=1
+#export TWITTER_DOWNLOADER_PREFETCH_QUALITY=360p
+#export TWITTER_DOWNLOADER_PREFETCH_MAX_JOBS=2
+
+# Optional result storage for delivery="url"/"redirect" (local or s3)
+#export TWITTER_DOWNLOADER_STORAGE=s3
+#export TWITTER_DOWNLOADER_S3_BUCKET="twitter-video-results"
+#export TWITTER_DOWNLOADER_S3_ENDPOINT="http://127.0.0.1:9000"
+#export TWITTER_DOWNLOADER_STORAGE_SECRET="change-me"
+#export TWITTER_DOWNLOADER_PUBLIC_BASE_URL="https://downloads.example.com"
+
+# Optional upstream rate limiting and egress rotation
+#export TWITTER_DOWNLOADER_UPSTREAM_RATE=1
+#export TWITTER_DOWNLOADER_PROXIES="http://proxy1:3128,http://proxy2:3128"
+#export TWITTER_DOWNLOADER_SOURCE_ADDRESSES="10.0.0.11,10.0.0.12"
+
+# Optional per-request profiling (X-Profile-Token header or sampling)
+#export TWITTER_DOWNLOADER_PROFILE_TOKEN="change-me"
+#export TWITTER_DOWNLOADER_PROFILE_SAMPLE_RATE=0.01
+
 # Start Gunicorn (foreground mode, stops with Ctrl+C)
 
 gunicorn -w 1 -b 127.0.0.1:6000 tw_api_v4:app \
@@ -0,0 +1,98 @@
+import os
+import subprocess
+
+import pytest
+
+import tw_v4
+from tw_v4 import TwitterVideoDownloader
+
+
+@pytest.fixture
+def downloader(tmp_path, monkeypatch):
+    monkeypatch.setenv('TWITTER_DOWNLOADER_CLEANUP_INTERVAL', '0')
+    monkeypatch.setenv('TWITTER_DOWNLOADER_FFMPEG', '/opt/ffmpeg/bin/ffmpeg')
+    return TwitterVideoDownloader(temp_dir=str(tmp_path))
+
+
+def combined(format_id, height, is_hls=False):
+    return {'format_id': format_id, 'height': height, 'is_hls': is_hls}
+
+
+def test_prefers_separate_audio_stream(downloader):
+    video = {
+        'audio_formats': [{'format_id': 'hls-audio-128000'}],
+        'combined_formats': [combined('http-832', 720)],
+    }
+    assert downloader._audio_format_selectors(video)[0] == 'hls-audio-128000'
+
+
+def test_falls_back_to_smallest_http_combined_format(downloader):
+    video = {
+        'audio_formats': [],
+        'combined_formats': [combined('http-2176', 1280), combined('hls-256', 180, is_hls=True),
+                             combined('http-632', 360), combined('http-950', 480)],
+    }
+    assert downloader._audio_format_selectors(video) == ['http-632', 'bestaudio/worst']
+
+
+def test_demux_copies_audio_stream(downloader, tmp_path, monkeypatch):
+    calls = []
+
+    def fake_run(command, **kwargs):
+        calls.append(command)
+        return subprocess.CompletedProcess(command, 0, '', '')
+
+    monkeypatch.setattr(tw_v4.subprocess, 'run', fake_run)
+    downloader._demux_audio(str(tmp_path / 'source.mp4'), str(tmp_path / 'audio.m4a'))
+
+    command = calls[0]
+    assert command[0] == '/opt/ffmpeg/bin/ffmpeg'
+    assert command[command.index('-i') + 1] == str(tmp_path / 'source.mp4')
+    assert command[command.index('-vn'):command.index('-vn') + 3] == ['-vn', '-c:a', 'copy']
+    assert command[-1] == str(tmp_path / 'audio.m4a')
+
+
+def test_demux_failure_removes_partial_output(downloader, tmp_path, monkeypatch):
+    audio_file = tmp_path / 'audio.m4a'
+
+    def fake_run(command, **kwargs):
+        audio_file.write_bytes(b'partial')
+        return subprocess.CompletedProcess(command, 1, '', 'Invalid data found when processing input')
+
+    monkeypatch.setattr(tw_v4.subprocess, 'run', fake_run)
+    with pytest.raises(Exception, match='Invalid data found'):
+        downloader._demux_audio(str(tmp_path / 'source.mp4'), str(audio_file))
+
+    assert not audio_file.exists()
+
+
+def test_demux_without_ffmpeg(downloader, tmp_path, monkeypatch):
+    monkeypatch.delenv('TWITTER_DOWNLOADER_FFMPEG')
+    monkeypatch.setattr(tw_v4.shutil, 'which', lambda name: None)
+
+    with pytest.raises(Exception, match='ffmpeg is required'):
+        downloader._demux_audio(str(tmp_path / 'source.mp4'), str(tmp_path / 'audio.m4a'))
+
+
+def test_download_audio_only_removes_source(downloader, monkeypatch):
+    video = {'audio_formats': [{'format_id': 'hls-audio-128000'}], 'combined_formats': []}
+    monkeypatch.setattr(downloader, '_resolve_target_video', lambda *args: video)
+
+    def fake_source(tweet_url, format_selector, filename_base, target_dir):
+        path = os.path.join(target_dir, f"{filename_base}.source.mp4")
+        with open(path, 'wb') as f:
+            f.write(b'source')
+        return path
+
+    def fake_run(command, **kwargs):
+        with open(command[-1], 'wb') as f:
+            f.write(b'audio')
+        return subprocess.CompletedProcess(command, 0, '', '')
+
+    monkeypatch.setattr(downloader, '_download_audio_source', fake_source)
+    monkeypatch.setattr(tw_v4.subprocess, 'run', fake_run)
+
+    audio_file = downloader.download_audio_only('https://x.com/a/status/1', 1)
+
+    assert audio_file.endswith('.m4a')
+    assert os.listdir(downloader.temp_dir) == [os.path.basename(audio_file)]
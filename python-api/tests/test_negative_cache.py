@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+from tw_v4 import NegativeResultCache, TwitterVideoDownloader, UnavailableVideoError
+
+
+@pytest.mark.parametrize('message, kind', [
+    ('ERROR: [twitter] 1790123404812345678: No video could be found in this tweet', 'no_media'),
+    ('ERROR: [twitter] 1790123429812345678: No video could be found in this tweet', 'no_media'),
+    ('ERROR: [twitter] 1790000000000000001: Unable to download JSON metadata: HTTP Error 429: Too Many Requests', 'rate_limited'),
+    ('ERROR: [twitter] 1790000000000000001: Unable to download JSON metadata: HTTP Error 404: Not Found', 'gone'),
+    ('ERROR: [twitter] 1790000000000000001: NSFW tweet requires authentication', 'private'),
+    ('ERROR: [twitter] 1790000000000000001: Read timed out', 'transient'),
+])
+def test_classify(message, kind):
+    assert NegativeResultCache.classify(message) == kind
+
+
+def test_check_raises_until_expiry():
+    cache = NegativeResultCache(ttls={'private': 60, 'transient': 0})
+    cache.put('https://x.com/a/status/1', 'private')
+    cache.put('https://x.com/a/status/2', 'transient')
+
+    with pytest.raises(UnavailableVideoError) as excinfo:
+        cache.check('https://x.com/a/status/1')
+    assert excinfo.value.kind == 'private'
+
+    cache.check('https://x.com/a/status/2')
+
+
+def test_upstream_retry_after_sets_ttl(tmp_path, monkeypatch):
+    monkeypatch.setenv('TWITTER_DOWNLOADER_CLEANUP_INTERVAL', '0')
+    downloader = TwitterVideoDownloader(temp_dir=str(tmp_path))
+
+    def rate_limited(url, fn):
+        raise UnavailableVideoError('rate_limited', 'rate limited', retry_after=900)
+
+    monkeypatch.setattr(downloader.governor, 'run', rate_limited)
+    assert downloader.get_video_info('https://x.com/a/status/1') is None
+
+    kind, _, expires_at = downloader.get_failure('https://x.com/a/status/1')
+    assert kind == 'rate_limited'
+    assert 890 < expires_at - time.time() <= 900
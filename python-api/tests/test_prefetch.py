@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+
+import tw_v4
+from tw_v4 import SpeculativePrefetcher, app
+
+
+class FakeDownloader:
+    def __init__(self, directory, release=None):
+        self.directory = directory
+        self.temp_dir = directory
+        self.release = release
+        self.cleaned = []
+        self.qualities = []
+
+    def download_with_audio_fix(self, tweet_url, quality, video_number, video_info=None):
+        self.qualities.append(quality)
+        if self.release:
+            self.release.wait(5)
+        path = os.path.join(self.directory, f"twitter_video_{video_number}_{quality}.mp4")
+        with open(path, 'wb') as f:
+            f.write(b'video')
+        return path
+
+    def safe_file_cleanup(self, file_path, delay=1.0):
+        self.cleaned.append(file_path)
+        os.remove(file_path)
+
+
+VIDEO_INFO = {'videos': [{'video_number': 1}]}
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+def test_other_quality_request_attaches_to_prefetch(tmp_path, monkeypatch):
+    downloader = FakeDownloader(str(tmp_path))
+    prefetcher = SpeculativePrefetcher(downloader, enabled=True, quality='360p', ttl=60)
+    monkeypatch.setattr(tw_v4, 'downloader_instance', downloader)
+    monkeypatch.setattr(tw_v4, 'prefetcher_instance', prefetcher)
+    prefetcher.schedule('https://x.com/a/status/1', VIDEO_INFO)
+
+    response = app.test_client().post('/download-with-audio', json={
+        'url': 'https://x.com/a/status/1', 'quality': '720p', 'video_number': 1,
+    })
+
+    assert response.status_code == 200
+    assert response.get_json()['file_size'] == len(b'video')
+    # Only the speculative 360p download ran; the 720p request reused it
+    assert downloader.qualities == ['360p']
+    assert prefetcher.claim('https://x.com/a/status/1', 1) is None
+
+
+def test_unclaimed_result_expires_without_further_requests(tmp_path):
+    downloader = FakeDownloader(str(tmp_path))
+    prefetcher = SpeculativePrefetcher(downloader, enabled=True, ttl=0.2)
+    prefetcher.schedule('https://x.com/a/status/1', VIDEO_INFO)
+
+    assert wait_for(lambda: downloader.cleaned)
+    assert not os.listdir(str(tmp_path))
+
+
+def test_claim_timeout_discards_late_result(tmp_path):
+    release = threading.Event()
+    downloader = FakeDownloader(str(tmp_path), release=release)
+    prefetcher = SpeculativePrefetcher(downloader, enabled=True, ttl=60)
+    prefetcher.schedule('https://x.com/a/status/1', VIDEO_INFO)
+
+    assert prefetcher.claim('https://x.com/a/status/1', 1, timeout=0.1) is None
+    release.set()
+
+    assert wait_for(lambda: downloader.cleaned)
+    assert not os.listdir(str(tmp_path))
@@ -0,0 +1,35 @@
+import pytest
+
+import tw_v4
+from tw_v4 import ProfileStore, app
+
+
+@pytest.fixture
+def profile_store(tmp_path, monkeypatch):
+    store = ProfileStore(str(tmp_path / 'profiles'), token='secret')
+    monkeypatch.setattr(tw_v4, 'profile_store_instance', store)
+    return store
+
+
+def test_profiled_request_is_downloadable(profile_store):
+    client = app.test_client()
+    response = client.post('/test-download', headers={'X-Profile-Token': 'secret'})
+    profile_id = response.headers['X-Profile-Id']
+
+    listing = client.get('/admin/profiles', headers={'X-Profile-Token': 'secret'}).get_json()
+    assert [profile['id'] for profile in listing['profiles']] == [profile_id]
+
+    timeline = client.get(f'/admin/profiles/{profile_id}', headers={'X-Profile-Token': 'secret'}).get_json()
+    assert timeline['path'] == '/test-download'
+
+    pstats = client.get(f'/admin/profiles/{profile_id}/pstats', headers={'X-Profile-Token': 'secret'})
+    assert pstats.status_code == 200 and pstats.data
+
+
+def test_wrong_or_non_ascii_token_is_not_admin(profile_store):
+    client = app.test_client()
+    response = client.post('/test-download', headers={'X-Profile-Token': 'sécret'})
+
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+    assert client.get('/admin/profiles', headers={'X-Profile-Token': 'sécret'}).status_code == 404
@@ -0,0 +1,88 @@
+import os
+import time
+
+import pytest
+from werkzeug.test import EnvironBuilder
+
+import tw_v4
+from tw_v4 import SpeculativePrefetcher, TwitterVideoDownloader, app
+
+
+@pytest.fixture
+def downloader(tmp_path, monkeypatch):
+    monkeypatch.setenv('TWITTER_DOWNLOADER_STAGING_RESERVE_MB', '0.25')
+    monkeypatch.setenv('TWITTER_DOWNLOADER_CLEANUP_INTERVAL', '0')
+    return TwitterVideoDownloader(temp_dir=str(tmp_path / 'disk'),
+                                  staging_dir=str(tmp_path / 'staging'),
+                                  staging_max_mb=1)
+
+
+def fill(directory, name, size, age=0):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(b'\0' * size)
+    if age:
+        old = time.time() - age
+        os.utime(path, (old, old))
+    return path
+
+
+def test_spills_to_disk_when_staging_is_full(downloader):
+    assert downloader._select_download_dir() == downloader.staging_dir
+
+    fill(downloader.staging_dir, 'twitter_video_1_360p_a.mp4', 900 * 1024)
+    assert downloader._select_download_dir() == downloader.temp_dir
+
+
+def test_expired_staging_files_are_reclaimed(downloader):
+    stale = fill(downloader.staging_dir, 'twitter_video_1_360p_a.mp4', 900 * 1024,
+                 age=(downloader.file_max_age_minutes + 1) * 60)
+
+    assert downloader._select_download_dir() == downloader.staging_dir
+    assert not os.path.exists(stale)
+
+
+@pytest.fixture
+def served_file(downloader, monkeypatch):
+    path = fill(downloader.staging_dir, 'twitter_video_1_360p_a.mp4', 4096)
+    monkeypatch.setattr(downloader, 'download_with_audio_fix', lambda *args, **kwargs: path)
+    monkeypatch.setattr(tw_v4, 'downloader_instance', downloader)
+    monkeypatch.setattr(tw_v4, 'prefetcher_instance', SpeculativePrefetcher(downloader, enabled=False))
+    return path
+
+
+def call_wsgi(body):
+    environ = EnvironBuilder(method='POST', path='/download-with-audio', json=body).get_environ()
+    status_headers = {}
+
+    def start_response(status, headers, exc_info=None):
+        status_headers['status'] = status
+        status_headers['headers'] = dict(headers)
+
+    app_iter = app.wsgi_app(environ, start_response)
+    try:
+        data = b''.join(app_iter)
+    finally:
+        if hasattr(app_iter, 'close'):
+            app_iter.close()
+    return status_headers['status'], status_headers['headers'], data
+
+
+def test_file_delivery_streams_and_removes_file(served_file):
+    status, headers, data = call_wsgi({'url': 'https://x.com/a/status/1', 'delivery': 'file'})
+
+    assert status.startswith('200')
+    assert headers['Content-Length'] == '4096'
+    assert len(data) == 4096
+    assert not os.path.exists(served_file)
+
+
+def test_file_delivery_offloads_to_accel_redirect(served_file, monkeypatch):
+    monkeypatch.setenv('TWITTER_DOWNLOADER_STAGING_ACCEL_PREFIX', '/protected/staging/')
+    status, headers, data = call_wsgi({'url': 'https://x.com/a/status/1', 'delivery': 'file'})
+
+    assert status.startswith('200')
+    assert headers['X-Accel-Redirect'] == '/protected/staging/twitter_video_1_360p_a.mp4'
+    assert data == b''
+    # nginx still has to read it; the cleanup timer removes it later
+    assert os.path.exists(served_file)
@@ -0,0 +1,124 @@
+import os
+import time
+from urllib.parse import urlparse
+
+import pytest
+
+import tw_v4
+from tw_v4 import LocalStorageBackend, S3StorageBackend, app, result_storage_key
+
+
+def write_result(tmp_path, content=b'video bytes'):
+    path = tmp_path / 'twitter_video_1_360p_abcd.mp4'
+    path.write_bytes(content)
+    return str(path)
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    storage = LocalStorageBackend(str(tmp_path / 'results'), secret='test-secret')
+    monkeypatch.setattr(tw_v4, 'storage_instance', storage)
+    monkeypatch.setattr(tw_v4, 'storage_configured', True)
+    return storage
+
+
+def test_local_put_moves_file_and_stats(tmp_path, local_storage):
+    key = result_storage_key('https://x.com/a/status/1', 1)
+    source = write_result(tmp_path)
+
+    assert local_storage.stat(key) is None
+    local_storage.put(source, key)
+
+    assert local_storage.stat(key) == len(b'video bytes')
+    assert not os.path.exists(source)
+
+
+def test_local_presigned_url_is_served_until_it_expires(tmp_path, local_storage):
+    key = result_storage_key('https://x.com/a/status/1', 1)
+    local_storage.put(write_result(tmp_path), key)
+
+    with app.test_request_context():
+        valid = urlparse(local_storage.presigned_url(key, 'video.mp4', 60))
+        expired = urlparse(local_storage.presigned_url(key, 'video.mp4', -1))
+
+    client = app.test_client()
+    response = client.get(f"{valid.path}?{valid.query}")
+    assert response.status_code == 200
+    assert response.data == b'video bytes'
+    response.close()
+
+    assert client.get(f"{expired.path}?{expired.query}").status_code == 403
+
+    tampered = valid.query.replace('filename=video.mp4', 'filename=other.mp4')
+    assert client.get(f"{valid.path}?{tampered}").status_code == 403
+
+
+def test_local_put_restarts_ttl_clock(tmp_path, local_storage):
+    key = result_storage_key('https://x.com/a/status/1', 1)
+    source = write_result(tmp_path)
+    month_ago = time.time() - 30 * 24 * 3600
+    os.utime(source, (month_ago, month_ago))
+
+    local_storage.put(source, key)
+    local_storage.put(write_result(tmp_path), result_storage_key('https://x.com/a/status/2', 1))
+
+    assert local_storage.stat(key) == len(b'video bytes')
+
+
+def test_local_presigned_url_uses_public_base_url(tmp_path):
+    storage = LocalStorageBackend(str(tmp_path / 'results'), secret='test-secret',
+                                  public_base_url='https://downloads.example.com/')
+    key = result_storage_key('https://x.com/a/status/1', 1)
+
+    with app.test_request_context(base_url='http://127.0.0.1:6000'):
+        url = urlparse(storage.presigned_url(key, 'video.mp4', 60))
+
+    assert (url.scheme, url.netloc) == ('https', 'downloads.example.com')
+    assert url.path == f"/results/{key}"
+
+
+def test_storage_key_ignores_quality_and_invalid_quality_is_rejected(local_storage):
+    assert result_storage_key('https://x.com/a/status/1', 1) != result_storage_key('https://x.com/a/status/1', 2)
+
+    response = app.test_client().post('/download-with-audio', json={
+        'url': 'https://x.com/a/status/1', 'quality': '720p"; x="', 'delivery': 'url',
+    })
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def s3_standin(monkeypatch):
+    """A MinIO-style S3 endpoint on localhost, served by moto's standalone server"""
+    server_module = pytest.importorskip('moto.server')
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+
+    server = server_module.ThreadedMotoServer(ip_address='127.0.0.1', port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    yield f"http://{host}:{port}"
+    server.stop()
+
+
+def test_s3_put_stat_and_presigned_url(tmp_path, s3_standin):
+    import boto3
+    import requests
+
+    boto3.client('s3', endpoint_url=s3_standin, region_name='us-east-1').create_bucket(Bucket='results')
+    storage = S3StorageBackend('results', prefix='tvd/', endpoint_url=s3_standin, region='us-east-1')
+    key = result_storage_key('https://x.com/a/status/1', 1)
+
+    assert storage.stat(key) is None
+    storage.put(write_result(tmp_path), key)
+    assert storage.stat(key) == len(b'video bytes')
+
+    presigned = storage.presigned_url(key, 'video.mp4', 300)
+    url = urlparse(presigned)
+    assert presigned.startswith(s3_standin)
+    assert url.path.endswith(f"tvd/{key}")
+
+    # A real HTTP GET against the stand-in endpoint
+    response = requests.get(presigned, timeout=10)
+    assert response.status_code == 200
+    assert response.content == b'video bytes'
+    assert 'video.mp4' in response.headers['Content-Disposition']
@@ -1,25 +1,516 @@
 import os
+import errno
 import json
+import cProfile
+import io
+import pstats
+import random
 import tempfile
 import yt_dlp
 import time
 import subprocess
 import shutil
 import platform
+import hashlib
+import hmac
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from flask import Flask, request, jsonify
+from urllib.parse import urlparse
+from flask import Flask, request, jsonify, send_file, redirect, abort, url_for, g
 from flask_cors import cross_origin
 
 app = Flask(__name__)
 
+# Profile of the request being handled by the current thread, if any
+_profile_local = threading.local()
+
+class RequestProfile:
+    """cProfile data plus a timeline of named spans for a single request"""
+
+    def __init__(self, method, path):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.spans = []
+        self.profiler = cProfile.Profile()
+        self._open_spans = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name, start, end, error=None):
+        span = {
+            'name': name,
+            'start_ms': round((start - self.started) * 1000, 2),
+            'duration_ms': round((end - start) * 1000, 2),
+            'thread': threading.current_thread().name,
+        }
+        if error:
+            span['error'] = error
+        with self._lock:
+            self.spans.append(span)
+
+    def open_span(self, name):
+        self._open_spans[name] = time.perf_counter()
+
+    def close_span(self, name, error=None):
+        start = self._open_spans.pop(name, None)
+        if start is not None:
+            self.add_span(name, start, time.perf_counter(), error)
+
+@contextmanager
+def profile_span(name):
+    """Record a timeline span on the current request's profile (no-op when not profiling)"""
+    profile = getattr(_profile_local, 'current', None)
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        profile.add_span(name, start, time.perf_counter(), error)
+
+def profile_postprocessor_hook(d):
+    """yt-dlp postprocessor hook that records ffmpeg post-processing as spans"""
+    profile = getattr(_profile_local, 'current', None)
+    if profile is None:
+        return
+
+    name = f"postprocessor:{d.get('postprocessor', 'unknown')}"
+    if d.get('status') == 'started':
+        profile.open_span(name)
+    elif d.get('status') == 'finished':
+        profile.close_span(name)
+
+class UnavailableVideoError(Exception):
+    """Raised when a tweet is known to be unextractable (served from the negative cache)"""
+
+    def __init__(self, kind, message, retry_after=None):
+        super().__init__(message)
+        self.kind = kind
+        self.retry_after = retry_after
+
+class NegativeResultCache:
+    """
+    Remembers tweets that could not be extracted so repeat requests fail fast.
+
+    Failures are classified as no_media, private, gone, rate_limited or transient,
+    each with its own TTL (seconds). TTLs can be overridden with environment
+    variables such as TWITTER_DOWNLOADER_NEGATIVE_TTL_PRIVATE.
+    """
+
+    DEFAULT_TTLS = {
+        'no_media': 3600,
+        'private': 600,
+        'gone': 86400,
+        'rate_limited': 60,
+        'transient': 15,
+    }
+
+    MESSAGES = {
+        'no_media': 'This tweet does not contain a video.',
+        'private': 'This tweet is private or requires login.',
+        'gone': 'This tweet has been deleted or is no longer available.',
+        'rate_limited': 'Twitter is rate limiting requests. Please try again shortly.',
+        'transient': 'Could not extract video information. Please try again shortly.',
+    }
+
+    # Substrings of yt-dlp error messages, checked in order. Status codes are only
+    # matched as "http error NNN": messages start with the tweet ID, which can
+    # contain any digit sequence.
+    _PATTERNS = [
+        ('rate_limited', ('http error 429', 'too many requests', 'rate limit', 'rate-limit')),
+        ('private', ('http error 401', 'http error 403', 'protected', 'private', 'login', 'log in',
+                     'authenticat', 'nsfw', 'age-restricted', 'sensitive')),
+        ('gone', ('http error 404', 'http error 410', 'deleted', 'does not exist', 'doesn\'t exist',
+                  'not found', 'suspended', 'unavailable')),
+        ('no_media', ('no video', 'no media', 'no formats', 'unsupported url')),
+    ]
+
+    def __init__(self, ttls=None, max_entries=10000):
+        self.ttls = dict(self.DEFAULT_TTLS)
+        for kind in self.ttls:
+            env_ttl = os.environ.get(f'TWITTER_DOWNLOADER_NEGATIVE_TTL_{kind.upper()}')
+            if env_ttl:
+                self.ttls[kind] = float(env_ttl)
+        if ttls:
+            self.ttls.update(ttls)
+
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def classify(cls, message):
+        """Map an extraction error message to a failure kind"""
+        lowered = (message or '').lower()
+        for kind, needles in cls._PATTERNS:
+            if any(needle in lowered for needle in needles):
+                return kind
+        return 'transient'
+
+    def get(self, tweet_url):
+        """Return the cached (kind, message, expires_at) for a URL, or None"""
+        with self._lock:
+            entry = self._entries.get(tweet_url)
+            if entry and entry[2] <= time.time():
+                del self._entries[tweet_url]
+                return None
+            return entry
+
+    def put(self, tweet_url, kind, detail=None, ttl=None):
+        """Cache a failure; ttl overrides the per-kind TTL (e.g. an upstream Retry-After)"""
+        if ttl is None:
+            ttl = self.ttls.get(kind, self.ttls['transient'])
+        if ttl <= 0:
+            return
+
+        expires_at = time.time() + ttl
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._prune()
+            self._entries[tweet_url] = (kind, self.MESSAGES[kind], expires_at)
+
+        print(f"Negative cache: {tweet_url} -> {kind} for {ttl:.0f}s ({detail or 'no detail'})")
+
+    def check(self, tweet_url):
+        """Raise UnavailableVideoError if the URL is in the negative cache"""
+        entry = self.get(tweet_url)
+        if entry:
+            kind, message, expires_at = entry
+            raise UnavailableVideoError(kind, message, retry_after=max(1, int(expires_at - time.time())))
+
+    def _prune(self):
+        """Drop expired entries, then the oldest ones if still full (caller holds the lock)"""
+        now = time.time()
+        for url in [url for url, entry in self._entries.items() if entry[2] <= now]:
+            del self._entries[url]
+
+        overflow = len(self._entries) - self.max_entries + 1
+        if overflow > 0:
+            oldest = sorted(self._entries, key=lambda url: self._entries[url][2])[:overflow]
+            for url in oldest:
+                del self._entries[url]
+
+class UpstreamBusyError(UnavailableVideoError):
+    """
+    Raised when the governor can't grant an upstream slot within its max wait.
+
+    This is local queue overflow, not something Twitter said about the tweet,
+    so it is never stored in the negative cache.
+    """
+
+    def __init__(self, retry_after=None):
+        super().__init__('rate_limited', 'The server is busy. Please try again shortly.', retry_after=retry_after)
+
+class TokenBucket:
+    """Token bucket rate limiter; reserve() returns how long the caller must wait"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, max_wait):
+        """Take a token, returning the wait in seconds, or None if it would exceed max_wait"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        if wait > max_wait:
+            return None
+        self.tokens -= 1
+        return wait
+
+class UpstreamGovernor:
+    """
+    Coordinates all upstream (yt-dlp) calls to stay under Twitter's rate limits.
+
+    Opt-in: without TWITTER_DOWNLOADER_UPSTREAM_RATE or an egress pool, calls
+    pass straight through and only an upstream 429 is turned into a rate_limited
+    error (so the strategy ladder stops instead of retrying).
+
+    When enabled, each upstream host gets a token bucket per egress route (if a
+    rate is set). HTTP 429 responses put that host/egress pair into backoff,
+    honouring Retry-After when present. With a pool of proxies or source
+    addresses, calls go through the healthiest egress that is not backing off,
+    and a 429 is retried on another egress.
+
+    Configured via environment variables:
+        TWITTER_DOWNLOADER_UPSTREAM_RATE       requests per second per host and egress (default: unlimited)
+        TWITTER_DOWNLOADER_UPSTREAM_BURST      bucket capacity (default: 5)
+        TWITTER_DOWNLOADER_UPSTREAM_MAX_WAIT   longest a request queues for a slot, seconds (default: 20)
+        TWITTER_DOWNLOADER_PROXIES             comma-separated proxy URLs
+        TWITTER_DOWNLOADER_SOURCE_ADDRESSES    comma-separated local source IPs
+    """
+
+    DEFAULT_BACKOFF = 30
+    MAX_BACKOFF = 900
+
+    # Twitter hosts that share the same rate limits
+    _HOST_ALIASES = {
+        'twitter.com': 'x.com',
+        'www.twitter.com': 'x.com',
+        'mobile.twitter.com': 'x.com',
+        'www.x.com': 'x.com',
+        'mobile.x.com': 'x.com',
+    }
+
+    def __init__(self, rate=None, burst=None, max_wait=None, proxies=None, source_addresses=None):
+        rate = rate or os.environ.get('TWITTER_DOWNLOADER_UPSTREAM_RATE')
+        self.rate = float(rate) if rate else None
+        self.burst = float(burst or os.environ.get('TWITTER_DOWNLOADER_UPSTREAM_BURST', 5))
+        self.max_wait = float(max_wait or os.environ.get('TWITTER_DOWNLOADER_UPSTREAM_MAX_WAIT', 20))
+
+        if proxies is None:
+            proxies = [p.strip() for p in os.environ.get('TWITTER_DOWNLOADER_PROXIES', '').split(',') if p.strip()]
+        if source_addresses is None:
+            source_addresses = [a.strip() for a in os.environ.get('TWITTER_DOWNLOADER_SOURCE_ADDRESSES', '').split(',') if a.strip()]
+
+        # Each egress carries the yt-dlp options that route traffic through it
+        # Names show up in logs and /health, so they never carry proxy credentials
+        self.egresses = [{'name': f'proxy:{self._redact_proxy(proxy)}', 'opts': {'proxy': proxy}} for proxy in proxies]
+        self.egresses += [{'name': f'source:{address}', 'opts': {'source_address': address}} for address in source_addresses]
+        self.enabled = self.rate is not None or bool(self.egresses)
+        if not self.egresses:
+            self.egresses = [{'name': 'direct', 'opts': {}}]
+        for egress in self.egresses:
+            egress['score'] = 1.0
+
+        self._buckets = {}
+        self._backoff = {}  # (host, egress name) -> (blocked_until, consecutive 429s)
+        self._next = 0
+        self._lock = threading.Lock()
+
+        if self.rate is not None:
+            print(f"Upstream rate limit: {self.rate}/s per host and egress, burst {self.burst:.0f}")
+        if len(self.egresses) > 1:
+            print(f"Upstream egress pool: {', '.join(egress['name'] for egress in self.egresses)}")
+
+    @staticmethod
+    def _redact_proxy(proxy):
+        """scheme://host:port of a proxy URL, without any user:password"""
+        parsed = urlparse(proxy)
+        try:
+            port = f":{parsed.port}" if parsed.port else ''
+        except ValueError:
+            port = ''
+        if not parsed.hostname:
+            return '<invalid proxy>'
+        host = f"[{parsed.hostname}]" if ':' in parsed.hostname else parsed.hostname
+        return f"{parsed.scheme}://{host}{port}"
+
+    def _host(self, url):
+        host = (urlparse(url).hostname or '').lower()
+        return self._HOST_ALIASES.get(host, host)
+
+    def _acquire(self, host, tried):
+        """Pick an egress for host and reserve a token, returning (egress, wait seconds)"""
+        now = time.time()
+        with self._lock:
+            candidates = [egress for egress in self.egresses if egress['name'] not in tried]
+            if not candidates:
+                return None, None
+
+            # Healthiest first, rotating between equally healthy egresses
+            self._next = (self._next + 1) % len(self.egresses)
+            candidates.sort(key=lambda egress: (-egress['score'], (self.egresses.index(egress) - self._next) % len(self.egresses)))
+
+            shortest_block = None
+            for egress in candidates:
+                key = (host, egress['name'])
+                blocked_until = self._backoff.get(key, (0, 0))[0]
+                if blocked_until > now:
+                    remaining = blocked_until - now
+                    shortest_block = remaining if shortest_block is None else min(shortest_block, remaining)
+                    continue
+
+                if self.rate is None:
+                    return egress, 0.0
+
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+                wait = bucket.reserve(self.max_wait)
+                if wait is not None:
+                    return egress, wait
+
+            return None, shortest_block
+
+    def run(self, url, fn):
+        """
+        Call fn(egress_opts) for an upstream request to url under the governor.
+
+        egress_opts are yt-dlp options (proxy / source_address) to merge into the
+        caller's options. Raises UnavailableVideoError('rate_limited') when no
+        egress can make the request within max_wait.
+        """
+        if not self.enabled:
+            try:
+                return fn({})
+            except Exception as e:
+                retry_after = self._rate_limit_retry_after(e)
+                if retry_after is None:
+                    raise
+                raise UnavailableVideoError('rate_limited', NegativeResultCache.MESSAGES['rate_limited'],
+                                            retry_after=retry_after or self.DEFAULT_BACKOFF)
+
+        host = self._host(url)
+        tried = set()
+
+        while True:
+            egress, wait = self._acquire(host, tried)
+            if egress is None:
+                if tried:
+                    # Every egress was just rate limited upstream
+                    raise UnavailableVideoError('rate_limited', NegativeResultCache.MESSAGES['rate_limited'],
+                                                retry_after=self._retry_after_for(host))
+                raise UpstreamBusyError(retry_after=int(wait) + 1 if wait else int(self.max_wait))
+
+            if wait:
+                print(f"Upstream governor: waiting {wait:.2f}s for {host} via {egress['name']}")
+                with profile_span(f"governor_wait:{host}"):
+                    time.sleep(wait)
+
+            try:
+                result = fn(dict(egress['opts']))
+            except Exception as e:
+                retry_after = self._rate_limit_retry_after(e)
+                if retry_after is None:
+                    self._record_error(egress, e)
+                    raise
+
+                self._record_rate_limited(host, egress, retry_after)
+                tried.add(egress['name'])
+                if len(tried) < len(self.egresses):
+                    print(f"Upstream governor: {host} rate limited via {egress['name']}, rotating egress")
+                    continue
+                raise UnavailableVideoError('rate_limited', NegativeResultCache.MESSAGES['rate_limited'],
+                                            retry_after=self._retry_after_for(host))
+
+            self._record_success(host, egress)
+            return result
+
+    def _rate_limit_retry_after(self, error):
+        """
+        Return the backoff in seconds if error is an HTTP 429 (None otherwise).
+
+        yt-dlp wraps the networking error, so the cause chain is searched for an
+        HTTP error with status 429 and its Retry-After header. An "HTTP Error 429"
+        message without a reachable cause yields 0, meaning "use the default backoff".
+        Bare digits are never matched: yt-dlp messages start with the tweet ID.
+        """
+        seen = set()
+        pending = [error]
+        while pending:
+            current = pending.pop()
+            if current is None or id(current) in seen:
+                continue
+            seen.add(id(current))
+
+            status = getattr(current, 'status', None) or getattr(current, 'code', None)
+            if status == 429:
+                response = getattr(current, 'response', None)
+                headers = getattr(response, 'headers', None) or getattr(current, 'headers', None) or {}
+                return self._parse_retry_after(headers.get('Retry-After')) or 0
+
+            exc_info = getattr(current, 'exc_info', None)
+            if exc_info and len(exc_info) > 1:
+                pending.append(exc_info[1])
+            pending.append(getattr(current, 'cause', None))
+            pending.append(current.__cause__)
+            pending.append(current.__context__)
+
+        message = str(error).lower()
+        if 'http error 429' in message or 'too many requests' in message:
+            return 0
+        return None
+
+    @staticmethod
+    def _parse_retry_after(value):
+        """Parse a Retry-After header (delta seconds or HTTP date) into seconds"""
+        if not value:
+            return None
+        try:
+            return max(0, int(float(value)))
+        except ValueError:
+            pass
+        try:
+            return max(0, int(parsedate_to_datetime(value).timestamp() - time.time()))
+        except (TypeError, ValueError):
+            return None
+
+    def _retry_after_for(self, host):
+        now = time.time()
+        with self._lock:
+            blocks = [self._backoff.get((host, egress['name']), (0, 0))[0] - now for egress in self.egresses]
+        return max(1, int(min(blocks)) + 1)
+
+    def _record_rate_limited(self, host, egress, retry_after):
+        with self._lock:
+            key = (host, egress['name'])
+            strikes = self._backoff.get(key, (0, 0))[1] + 1
+            if not retry_after:
+                retry_after = min(self.MAX_BACKOFF, self.DEFAULT_BACKOFF * (2 ** (strikes - 1)))
+            self._backoff[key] = (time.time() + retry_after, strikes)
+            egress['score'] = max(0.05, egress['score'] * 0.5)
+        print(f"Upstream governor: 429 from {host} via {egress['name']}, backing off {retry_after}s")
+
+    def _record_error(self, egress, error):
+        # Only connection-level failures say anything about the egress itself
+        message = str(error).lower()
+        if any(needle in message for needle in ('proxy', 'timed out', 'connection', 'unreachable', 'network')):
+            with self._lock:
+                egress['score'] = max(0.05, egress['score'] * 0.8)
+
+    def _record_success(self, host, egress):
+        with self._lock:
+            self._backoff.pop((host, egress['name']), None)
+            egress['score'] = min(1.0, egress['score'] + 0.1)
+
+    def status(self):
+        """Snapshot of egress health and active backoffs for the health endpoint"""
+        now = time.time()
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'rate': self.rate,
+                'egresses': [{'name': egress['name'], 'score': round(egress['score'], 2)} for egress in self.egresses],
+                'backoff': [
+                    {'host': host, 'egress': name, 'seconds_left': round(until - now, 1)}
+                    for (host, name), (until, _) in self._backoff.items() if until > now
+                ],
+            }
+
 class TwitterVideoDownloader:
-    def __init__(self, temp_dir=None):
+    def __init__(self, temp_dir=None, staging_dir=None, staging_max_mb=None):
         """
         Initialize downloader with configurable temp directory
 
         Args:
             temp_dir: Custom temporary directory path. If None, uses system default.
                      Can be set via environment variable TWITTER_DOWNLOADER_TEMP_DIR
+            staging_dir: Optional RAM-backed (tmpfs) staging directory, e.g. /dev/shm/twitter_downloader.
+                     Can be set via environment variable TWITTER_DOWNLOADER_STAGING_DIR
+            staging_max_mb: Size cap for the staging directory. Downloads spill over to
+                     temp_dir once the cap would be exceeded.
+                     Can be set via environment variable TWITTER_DOWNLOADER_STAGING_MAX_MB
+
+        The space reserved in staging for a download of unknown size is set with
+        TWITTER_DOWNLOADER_STAGING_RESERVE_MB (default: 64).
         """
         # Priority: 1. Parameter, 2. Environment variable, 3. System default
         if temp_dir:
@@ -41,6 +532,26 @@ class TwitterVideoDownloader:
         # Ensure temp directory exists and is writable
         self._ensure_temp_dir()
 
+        # Known-bad tweets (no video, private, deleted, ...) fail fast on repeat
+        self.negative_cache = NegativeResultCache()
+
+        # Rate-limit-aware gate around every upstream yt-dlp call
+        self.governor = UpstreamGovernor()
+
+        # Optional tmpfs staging tier in front of the disk temp directory
+        self.staging_dir = staging_dir or os.environ.get('TWITTER_DOWNLOADER_STAGING_DIR') or None
+        if staging_max_mb is None:
+            staging_max_mb = os.environ.get('TWITTER_DOWNLOADER_STAGING_MAX_MB', 256)
+        self.staging_max_bytes = int(float(staging_max_mb) * 1024 * 1024)
+        self.staging_reserve_bytes = int(float(os.environ.get('TWITTER_DOWNLOADER_STAGING_RESERVE_MB', 64)) * 1024 * 1024)
+        self._ensure_staging_dir()
+
+        # Finished files nobody removes (X-Accel-Redirect, abandoned downloads) are swept after this age
+        self.file_max_age_minutes = float(os.environ.get('TWITTER_DOWNLOADER_FILE_MAX_AGE_MINUTES', 30))
+        self.cleanup_interval = float(os.environ.get('TWITTER_DOWNLOADER_CLEANUP_INTERVAL', 300))
+        self._cleanup_timer = None
+        self._start_cleanup_timer()
+
         # Check available space on startup
         self._check_disk_space()
 
@@ -71,6 +582,94 @@ class TwitterVideoDownloader:
             except Exception as fallback_error:
                 print(f"Warning: Could not ensure fallback temp directory: {fallback_error}")
 
+    def _ensure_staging_dir(self):
+        """Ensure the optional staging directory exists and is writable, disable it otherwise"""
+        if not self.staging_dir:
+            return
+
+        try:
+            self.staging_dir = os.path.abspath(self.staging_dir)
+            staging_path = Path(self.staging_dir)
+            staging_path.mkdir(parents=True, exist_ok=True)
+
+            test_file = staging_path / 'test_write.tmp'
+            test_file.write_text('test')
+            test_file.unlink()
+
+            print(f"Using staging directory: {self.staging_dir} (cap: {self.staging_max_bytes / (1024 * 1024):.1f} MB)")
+
+        except Exception as e:
+            print(f"Error with staging directory {self.staging_dir}: {e}")
+            print("Staging disabled, downloads go straight to the temp directory")
+            self.staging_dir = None
+
+    def _dir_usage_bytes(self, directory):
+        """Total size of downloader files currently held in a directory"""
+        total = 0
+        try:
+            for file_path in Path(directory).iterdir():
+                if file_path.name.startswith('twitter_video_') and file_path.is_file():
+                    try:
+                        total += file_path.stat().st_size
+                    except OSError:
+                        pass
+        except Exception as e:
+            print(f"Error measuring usage of {directory}: {e}")
+        return total
+
+    def _select_download_dir(self, expected_bytes=0):
+        """
+        Pick the directory for the next download.
+
+        Uses the staging directory while the download is expected to fit under its
+        size cap (and in its free space), otherwise spills over to the disk temp directory.
+        """
+        if not self.staging_dir:
+            return self.temp_dir
+
+        needed = max(expected_bytes or 0, self.staging_reserve_bytes)
+        try:
+            used = self._dir_usage_bytes(self.staging_dir)
+            free = shutil.disk_usage(self.staging_dir).free
+        except Exception as e:
+            print(f"Error checking staging directory: {e}")
+            return self.temp_dir
+
+        if used + needed > self.staging_max_bytes:
+            # Reclaim expired files before giving up on the staging tier
+            self._cleanup_old_files(directories=[self.staging_dir])
+            used = self._dir_usage_bytes(self.staging_dir)
+
+        if used + needed <= self.staging_max_bytes and needed < free:
+            return self.staging_dir
+
+        print(f"Staging full ({used / (1024 * 1024):.1f} MB used), spilling over to {self.temp_dir}")
+        return self.temp_dir
+
+    def _tier_for_path(self, file_path):
+        """Return 'staging' or 'disk' depending on which directory holds file_path"""
+        parent = os.path.dirname(os.path.abspath(file_path))
+        if self.staging_dir and parent == self.staging_dir:
+            return 'staging'
+        return 'disk'
+
+    def accel_redirect_uri(self, file_path):
+        """
+        Build an X-Accel-Redirect URI for a finished file so the front proxy serves it.
+
+        Configured per tier via TWITTER_DOWNLOADER_ACCEL_PREFIX (temp dir) and
+        TWITTER_DOWNLOADER_STAGING_ACCEL_PREFIX (staging dir), each pointing at an
+        internal nginx location aliased to that directory. Returns None if not configured.
+        """
+        if self._tier_for_path(file_path) == 'staging':
+            prefix = os.environ.get('TWITTER_DOWNLOADER_STAGING_ACCEL_PREFIX')
+        else:
+            prefix = os.environ.get('TWITTER_DOWNLOADER_ACCEL_PREFIX')
+
+        if not prefix:
+            return None
+        return f"{prefix.rstrip('/')}/{os.path.basename(file_path)}"
+
     def _check_disk_space(self, min_free_mb=100):
         """Check available disk space in temp directory"""
         try:
@@ -92,27 +691,49 @@ class TwitterVideoDownloader:
             print(f"Error checking disk space: {e}")
             return True  # Assume OK if we can't check
 
-    def _cleanup_old_files(self, max_age_minutes=30):
+    def _start_cleanup_timer(self):
+        """Periodically sweep expired files from the temp and staging directories"""
+        if self.cleanup_interval <= 0:
+            return
+
+        def sweep():
+            self._cleanup_old_files()
+            self._start_cleanup_timer()
+
+        self._cleanup_timer = threading.Timer(self.cleanup_interval, sweep)
+        self._cleanup_timer.daemon = True
+        self._cleanup_timer.start()
+
+    def _cleanup_old_files(self, max_age_minutes=None, directories=None):
         """Clean up old temporary files to free space (cross-platform)"""
+        if max_age_minutes is None:
+            max_age_minutes = self.file_max_age_minutes
+        if directories is None:
+            directories = [self.temp_dir, self.staging_dir]
+
         try:
             current_time = time.time()
             cleaned_count = 0
-            temp_path = Path(self.temp_dir)
 
-            if not temp_path.exists():
-                return
-
-            # Use pathlib for better cross-platform file handling
-            for file_path in temp_path.iterdir():
-                if file_path.name.startswith('twitter_video_') and file_path.is_file():
-                    try:
-                        file_age = current_time - file_path.stat().st_mtime
-                        if file_age > (max_age_minutes * 60):
-                            file_path.unlink()
-                            cleaned_count += 1
-                            print(f"Cleaned up old temp file: {file_path.name}")
-                    except Exception as e:
-                        print(f"Error cleaning file {file_path.name}: {e}")
+            for directory in directories:
+                if not directory:
+                    continue
+
+                temp_path = Path(directory)
+                if not temp_path.exists():
+                    continue
+
+                # Use pathlib for better cross-platform file handling
+                for file_path in temp_path.iterdir():
+                    if file_path.name.startswith('twitter_video_') and file_path.is_file():
+                        try:
+                            file_age = current_time - file_path.stat().st_mtime
+                            if file_age > (max_age_minutes * 60):
+                                file_path.unlink()
+                                cleaned_count += 1
+                                print(f"Cleaned up old temp file: {file_path.name}")
+                        except Exception as e:
+                            print(f"Error cleaning file {file_path.name}: {e}")
 
             if cleaned_count > 0:
                 print(f"Cleaned up {cleaned_count} old temporary files")
@@ -121,7 +742,17 @@ class TwitterVideoDownloader:
             print(f"Error during cleanup: {e}")
 
     def get_video_info(self, tweet_url):
-        """Extract video information from Twitter URL using yt-dlp"""
+        """
+        Extract video information from Twitter URL using yt-dlp
+
+        Returns None on failure; the classified reason is recorded in
+        self.negative_cache and can be looked up with get_failure(). Raises
+        UpstreamBusyError when the upstream governor has no free slot.
+        """
+        if self.negative_cache.get(tweet_url):
+            print(f"Negative cache hit, skipping extraction: {tweet_url}")
+            return None
+
         try:
             # Enhanced ydl options to get all format information
             ydl_opts = {
@@ -132,46 +763,65 @@ class TwitterVideoDownloader:
                 'youtube_include_dash_manifest': False,
             }
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(tweet_url, download=False)
+            def extract(egress_opts):
+                with yt_dlp.YoutubeDL({**ydl_opts, **egress_opts}) as ydl:
+                    return ydl.extract_info(tweet_url, download=False)
 
-                if not info:
-                    return None
+            with profile_span('extract_info'):
+                info = self.governor.run(tweet_url, extract)
 
-                videos = []
+            if not info:
+                self.negative_cache.put(tweet_url, 'no_media', 'empty extraction result')
+                return None
 
-                # Check if this is a playlist (multiple videos)
-                if 'entries' in info and info['entries']:
-                    # Multiple videos case
-                    for i, entry in enumerate(info['entries']):
-                        if entry and 'formats' in entry:
-                            video_data = self._extract_single_video_info(entry, i + 1)
-                            if video_data:
-                                videos.append(video_data)
-                else:
-                    # Single video case
-                    video_data = self._extract_single_video_info(info, 1)
-                    if video_data:
-                        videos.append(video_data)
-
-                if not videos:
-                    return None
-
-                return {
-                    'success': True,
-                    'video_count': len(videos),
-                    'videos': videos,
-                    'tweet_info': {
-                        'title': info.get('title', 'Twitter Video'),
-                        'uploader': info.get('uploader', ''),
-                        'description': info.get('description', ''),
-                    }
+            videos = []
+
+            # Check if this is a playlist (multiple videos)
+            if 'entries' in info and info['entries']:
+                # Multiple videos case
+                for i, entry in enumerate(info['entries']):
+                    if entry and 'formats' in entry:
+                        video_data = self._extract_single_video_info(entry, i + 1)
+                        if video_data:
+                            videos.append(video_data)
+            else:
+                # Single video case
+                video_data = self._extract_single_video_info(info, 1)
+                if video_data:
+                    videos.append(video_data)
+
+            if not videos:
+                self.negative_cache.put(tweet_url, 'no_media', 'no video formats found')
+                return None
+
+            return {
+                'success': True,
+                'video_count': len(videos),
+                'videos': videos,
+                'tweet_info': {
+                    'title': info.get('title', 'Twitter Video'),
+                    'uploader': info.get('uploader', ''),
+                    'description': info.get('description', ''),
                 }
+            }
+
+        except UpstreamBusyError:
+            # Our own queue is full; says nothing about the tweet
+            raise
 
         except Exception as e:
             print(f"Error extracting video info: {e}")
+            if isinstance(e, UnavailableVideoError):
+                # Keep the upstream backoff instead of retrying after the fixed TTL
+                self.negative_cache.put(tweet_url, e.kind, str(e), ttl=e.retry_after)
+            else:
+                self.negative_cache.put(tweet_url, NegativeResultCache.classify(str(e)), str(e))
             return None
 
+    def get_failure(self, tweet_url):
+        """Return the cached (kind, message, expires_at) failure for a URL, or None"""
+        return self.negative_cache.get(tweet_url)
+
     def _extract_single_video_info(self, entry, video_number):
         """Extract information for a single video entry"""
         try:
@@ -275,31 +925,43 @@ class TwitterVideoDownloader:
             print(f"Error extracting single video info: {e}")
             return None
 
-    def download_with_audio_fix(self, tweet_url, quality='360p', video_number=1):
-        """Download video with proper audio handling and improved file management"""
-        downloaded_file = None
-        try:
-            # Check disk space before starting download
+    def _resolve_target_video(self, tweet_url, video_number, video_info=None):
+        """Common download preamble: negative cache, disk space, extraction and video lookup"""
+        # Fail fast for tweets already known to be unextractable
+        self.negative_cache.check(tweet_url)
+
+        # Check disk space before starting download
+        if not self._check_disk_space(min_free_mb=50):
+            # Try to clean up old files
+            self._cleanup_old_files()
+            # Check again
             if not self._check_disk_space(min_free_mb=50):
-                # Try to clean up old files
-                self._cleanup_old_files()
-                # Check again
-                if not self._check_disk_space(min_free_mb=50):
-                    raise Exception("Insufficient disk space for download. Please free up space or use a different temp directory.")
+                raise Exception("Insufficient disk space for download. Please free up space or use a different temp directory.")
 
-            # First, get video info to understand format structure
+        # First, get video info to understand format structure
+        if video_info is None:
             video_info = self.get_video_info(tweet_url)
-            if not video_info or not video_info['videos']:
-                raise Exception("Could not extract video information")
+        if not video_info or not video_info['videos']:
+            self.negative_cache.check(tweet_url)
+            raise Exception("Could not extract video information")
 
-            target_video = None
-            for video in video_info['videos']:
-                if video['video_number'] == video_number:
-                    target_video = video
-                    break
+        for video in video_info['videos']:
+            if video['video_number'] == video_number:
+                return video
+
+        raise Exception(f"Video #{video_number} not found")
 
-            if not target_video:
-                raise Exception(f"Video #{video_number} not found")
+    def download_with_audio_fix(self, tweet_url, quality='360p', video_number=1, video_info=None):
+        """
+        Download video with proper audio handling and improved file management
+
+        Args:
+            video_info: Result of a previous get_video_info() call for tweet_url.
+                        Skips the extra extraction when provided.
+        """
+        downloaded_file = None
+        try:
+            target_video = self._resolve_target_video(tweet_url, video_number, video_info)
 
             print(f"Found video with {len(target_video['audio_formats'])} audio formats and {len(target_video['video_formats'])} video formats")
 
@@ -308,6 +970,12 @@ class TwitterVideoDownloader:
             unique_id = str(uuid.uuid4())[:8]
             filename = f"twitter_video_{video_number}_{quality}_{unique_id}"
 
+            # Stage in RAM when it fits, otherwise spill over to disk
+            expected_bytes = 0
+            if target_video['combined_formats']:
+                expected_bytes = target_video['combined_formats'][0].get('filesize') or 0
+            target_dir = self._select_download_dir(expected_bytes)
+
             # Strategy selection based on available formats
             success = False
             final_file = None
@@ -317,24 +985,24 @@ class TwitterVideoDownloader:
                 print("Attempting download with combined format...")
                 combined_format = target_video['combined_formats'][0]
                 format_selector = combined_format['format_id']
-                success, final_file = self._attempt_download_fixed(tweet_url, format_selector, filename, "combined")
+                success, final_file = self._attempt_download_fixed(tweet_url, format_selector, filename, "combined", target_dir)
 
             # Strategy 2: Use separate video + audio streams with SAME PROTOCOL
             if not success and target_video['video_formats'] and target_video['audio_formats']:
                 print("Attempting download with separate video+audio streams (matching protocols)...")
-                success, final_file = self._try_separate_streams(tweet_url, target_video, filename)
+                success, final_file = self._try_separate_streams(tweet_url, target_video, filename, target_dir)
 
             # Strategy 3: Try with yt-dlp's automatic format selection (simplified)
             if not success:
                 print("Attempting download with automatic format selection...")
                 format_selector = "best[height<=720]/best"
-                success, final_file = self._attempt_download_fixed(tweet_url, format_selector, filename, "auto")
+                success, final_file = self._attempt_download_fixed(tweet_url, format_selector, filename, "auto", target_dir)
 
             # Strategy 4: Last resort - basic best format
             if not success:
                 print("Attempting download with basic best format...")
                 format_selector = "best"
-                success, final_file = self._attempt_download_fixed(tweet_url, format_selector, filename, "fallback")
+                success, final_file = self._attempt_download_fixed(tweet_url, format_selector, filename, "fallback", target_dir)
 
             if not success or not final_file:
                 raise Exception("All download strategies failed")
@@ -360,7 +1028,7 @@ class TwitterVideoDownloader:
                     pass
             raise e
 
-    def _try_separate_streams(self, tweet_url, target_video, filename):
+    def _try_separate_streams(self, tweet_url, target_video, filename, target_dir=None):
         """Try downloading with separate video and audio streams"""
         # Group formats by protocol
         video_by_protocol = {}
@@ -396,20 +1064,21 @@ class TwitterVideoDownloader:
                 format_selector = f"{best_video['format_id']}+{best_audio['format_id']}"
                 print(f"Using {protocol.upper()} protocol - Video: {best_video['format_id']} + Audio: {best_audio['format_id']}")
 
-                success, final_file = self._attempt_download_fixed(tweet_url, format_selector, filename, f"separate_{protocol}")
+                success, final_file = self._attempt_download_fixed(tweet_url, format_selector, filename, f"separate_{protocol}", target_dir)
                 if success:
                     return success, final_file
 
         return False, None
 
-    def _attempt_download_fixed(self, tweet_url, format_selector, filename_base, strategy_name):
+    def _attempt_download_fixed(self, tweet_url, format_selector, filename_base, strategy_name, target_dir=None):
         """Improved download attempt with better error handling and file management (cross-platform)"""
         temp_file_path = None
+        target_dir = target_dir or self.temp_dir
         try:
             print(f"Strategy '{strategy_name}': Using format selector: {format_selector}")
 
             # Create full temp file path using pathlib for cross-platform compatibility
-            temp_file_path = str(Path(self.temp_dir) / f"{filename_base}.mp4")
+            temp_file_path = str(Path(target_dir) / f"{filename_base}.mp4")
 
             # Simple download options - avoid complex post-processing
             ydl_opts = {
@@ -428,10 +1097,18 @@ class TwitterVideoDownloader:
                 'socket_timeout': 30,
                 'retries': 3,
                 'fragment_retries': 3,
+                # Keep the local mtime: the age-based cleanup must not see the
+                # CDN's Last-Modified date on a file we just downloaded
+                'updatetime': False,
+                'postprocessor_hooks': [profile_postprocessor_hook],
             }
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([tweet_url])
+            def download(egress_opts):
+                with yt_dlp.YoutubeDL({**ydl_opts, **egress_opts}) as ydl:
+                    ydl.download([tweet_url])
+
+            with profile_span(f"strategy:{strategy_name}"):
+                self.governor.run(tweet_url, download)
 
             # Wait a moment for file system to sync
             time.sleep(0.5)
@@ -447,7 +1124,7 @@ class TwitterVideoDownloader:
                     print(f"Strategy '{strategy_name}' created empty file")
 
             # If exact path doesn't exist, look for similar files using pathlib
-            temp_dir_path = Path(self.temp_dir)
+            temp_dir_path = Path(target_dir)
             basename = Path(filename_base).stem
 
             for file_path in temp_dir_path.iterdir():
@@ -472,8 +1149,126 @@ class TwitterVideoDownloader:
                         temp_path.unlink()
                 except Exception as cleanup_error:
                     print(f"Could not clean up partial file: {cleanup_error}")
+            # Rate limiting is not a format problem; don't burn the remaining strategies
+            if isinstance(e, UnavailableVideoError):
+                raise
             return False, None
 
+    def download_audio_only(self, tweet_url, video_number=1, video_info=None):
+        """
+        Download only the soundtrack of a video as M4A without re-encoding.
+
+        Fetches the separate audio stream when the tweet has one, otherwise the
+        smallest combined format, and demuxes it with ffmpeg (-vn -c:a copy).
+        """
+        source_file = None
+        try:
+            target_video = self._resolve_target_video(tweet_url, video_number, video_info)
+
+            unique_id = str(uuid.uuid4())[:8]
+            filename = f"twitter_video_{video_number}_audio_{unique_id}"
+            target_dir = self._select_download_dir()
+
+            for format_selector in self._audio_format_selectors(target_video):
+                source_file = self._download_audio_source(tweet_url, format_selector, filename, target_dir)
+                if source_file:
+                    break
+
+            if not source_file:
+                raise Exception("All audio download strategies failed")
+
+            audio_file = str(Path(target_dir) / f"{filename}.m4a")
+            with profile_span('ffmpeg_demux_audio'):
+                self._demux_audio(source_file, audio_file)
+
+            file_size = os.path.getsize(audio_file)
+            if file_size == 0:
+                raise Exception("Extracted audio file is empty")
+
+            print(f"Audio extraction successful: {audio_file} ({file_size / 1024:.1f} KB)")
+            return audio_file
+
+        except Exception as e:
+            print(f"Error in download_audio_only: {e}")
+            raise e
+
+        finally:
+            if source_file:
+                self.safe_file_cleanup(source_file, delay=0)
+
+    def _audio_format_selectors(self, target_video):
+        """Format selectors to try for audio: audio-only stream, smallest combined format, then yt-dlp's pick"""
+        format_selectors = []
+        if target_video['audio_formats']:
+            format_selectors.append(target_video['audio_formats'][0]['format_id'])
+        if target_video['combined_formats']:
+            # Prefer HTTP over HLS, then the lowest resolution (fewest bytes)
+            smallest = min(target_video['combined_formats'], key=lambda x: (x['is_hls'], x['height'] or 0))
+            format_selectors.append(smallest['format_id'])
+        format_selectors.append("bestaudio/worst")
+        return format_selectors
+
+    def _download_audio_source(self, tweet_url, format_selector, filename_base, target_dir):
+        """Download a single format as-is (no merge or conversion) and return its path"""
+        try:
+            print(f"Audio strategy: Using format selector: {format_selector}")
+
+            ydl_opts = {
+                'format': format_selector,
+                'outtmpl': str(Path(target_dir) / f"{filename_base}.source.%(ext)s"),
+                'quiet': False,
+                'no_warnings': False,
+                'socket_timeout': 30,
+                'retries': 3,
+                'fragment_retries': 3,
+                'updatetime': False,
+            }
+
+            def download(egress_opts):
+                with yt_dlp.YoutubeDL({**ydl_opts, **egress_opts}) as ydl:
+                    ydl.download([tweet_url])
+
+            with profile_span(f"audio_source:{format_selector}"):
+                self.governor.run(tweet_url, download)
+
+            for file_path in Path(target_dir).iterdir():
+                if (file_path.name.startswith(f"{filename_base}.source.") and
+                    not file_path.name.endswith('.part') and
+                    file_path.is_file() and file_path.stat().st_size > 0):
+                    return str(file_path)
+
+            return None
+
+        except Exception as e:
+            print(f"Audio strategy '{format_selector}' failed: {e}")
+            for file_path in Path(target_dir).glob(f"{filename_base}.source.*"):
+                try:
+                    file_path.unlink()
+                except Exception as cleanup_error:
+                    print(f"Could not clean up partial file: {cleanup_error}")
+            if isinstance(e, UnavailableVideoError):
+                raise
+            return None
+
+    def _demux_audio(self, source_file, audio_file):
+        """Copy the audio stream of source_file into an M4A container without decoding"""
+        ffmpeg = os.environ.get('TWITTER_DOWNLOADER_FFMPEG') or shutil.which('ffmpeg')
+        if not ffmpeg:
+            raise Exception("ffmpeg is required for audio extraction but was not found")
+
+        command = [
+            ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+            '-i', source_file,
+            '-vn', '-c:a', 'copy',
+            '-movflags', '+faststart',
+            audio_file,
+        ]
+        result = subprocess.run(command, capture_output=True, text=True, timeout=120)
+        if result.returncode != 0:
+            if os.path.exists(audio_file):
+                os.remove(audio_file)
+            raise Exception(f"ffmpeg audio demux failed: {result.stderr.strip()[-500:]}")
+
     def safe_file_cleanup(self, file_path, delay=1.0):
         """Safely cleanup downloaded file with delay (cross-platform)"""
         if not file_path:
@@ -503,6 +1298,551 @@ def get_downloader():
         downloader_instance = TwitterVideoDownloader(temp_dir=custom_temp)
     return downloader_instance
 
+class SpeculativePrefetcher:
+    """
+    Background prefetch of the most likely download after /extract.
+
+    The plugin flow is /extract followed shortly by /download-with-audio, so the
+    default video is downloaded speculatively and the download request attaches
+    to the running or finished job. Jobs are matched on URL and video number only,
+    since the requested quality does not change which formats are downloaded.
+    Unclaimed jobs expire after a TTL and their files are removed.
+
+    Configured via environment variables:
+        TWITTER_DOWNLOADER_PREFETCH            enable with 1/true (default: off)
+        TWITTER_DOWNLOADER_PREFETCH_QUALITY    quality label for prefetched files (default: 360p)
+        TWITTER_DOWNLOADER_PREFETCH_VIDEO      video number to prefetch (default: 1)
+        TWITTER_DOWNLOADER_PREFETCH_MAX_JOBS   concurrent speculative jobs (default: 2)
+        TWITTER_DOWNLOADER_PREFETCH_TTL        seconds an unclaimed result is kept (default: 120)
+    """
+
+    def __init__(self, downloader, enabled=None, quality=None, video_number=None, max_jobs=None, ttl=None):
+        if enabled is None:
+            enabled = os.environ.get('TWITTER_DOWNLOADER_PREFETCH', '').lower() in ('1', 'true', 'yes', 'on')
+        self.enabled = enabled
+        self.downloader = downloader
+        self.quality = quality or os.environ.get('TWITTER_DOWNLOADER_PREFETCH_QUALITY', '360p')
+        self.video_number = int(video_number or os.environ.get('TWITTER_DOWNLOADER_PREFETCH_VIDEO', 1))
+        self.max_jobs = int(max_jobs or os.environ.get('TWITTER_DOWNLOADER_PREFETCH_MAX_JOBS', 2))
+        self.ttl = float(ttl or os.environ.get('TWITTER_DOWNLOADER_PREFETCH_TTL', 120))
+
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix='prefetch') if self.enabled else None
+
+        if self.enabled:
+            print(f"Speculative prefetch enabled: {self.quality} video #{self.video_number}, "
+                  f"max {self.max_jobs} jobs, TTL {self.ttl:.0f}s")
+
+    def _key(self, tweet_url, video_number):
+        # download_with_audio_fix picks formats by availability, not by quality, so
+        # every quality of the same video produces the same file
+        return (tweet_url, int(video_number))
+
+    def schedule(self, tweet_url, video_info):
+        """Start a speculative download for the default choice if the budget allows"""
+        if not self.enabled:
+            return
+
+        video_numbers = [video['video_number'] for video in video_info.get('videos', [])]
+        if self.video_number not in video_numbers:
+            return
+
+        key = self._key(tweet_url, self.video_number)
+        with self._lock:
+            if key in self._jobs:
+                return
+
+            active = sum(1 for job in self._jobs.values() if not job['future'].done())
+            if active >= self.max_jobs:
+                print(f"Prefetch budget exhausted ({active} jobs), skipping {tweet_url}")
+                return
+
+            print(f"Prefetching {tweet_url} ({self.quality}, video #{self.video_number})")
+            future = self._executor.submit(self.downloader.download_with_audio_fix,
+                                           tweet_url, self.quality, self.video_number, video_info)
+            # Expire on a timer so unclaimed results don't wait for the next request
+            timer = threading.Timer(self.ttl, self._expire, args=(key, future))
+            timer.daemon = True
+            self._jobs[key] = {'future': future, 'timer': timer}
+            timer.start()
+
+    def claim(self, tweet_url, video_number, timeout=300):
+        """
+        Attach to a prefetched download. Waits for a running job and returns the
+        file path, or None if there is no usable job for this request.
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            job = self._jobs.pop(self._key(tweet_url, video_number), None)
+
+        if not job:
+            return None
+
+        job['timer'].cancel()
+
+        try:
+            file_path = job['future'].result(timeout=timeout)
+        except FutureTimeoutError:
+            print(f"Prefetched download still running after {timeout}s, falling back")
+            # Nobody owns the job any more; drop its file when it lands
+            job['future'].add_done_callback(self._discard_result)
+            return None
+        except Exception as e:
+            print(f"Prefetched download unusable, falling back: {e}")
+            return None
+
+        if not file_path or not os.path.exists(file_path):
+            return None
+
+        print(f"Using prefetched file: {file_path}")
+        return file_path
+
+    def _expire(self, key, future):
+        """Cancel or discard a speculative job nobody claimed within the TTL"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if not job or job['future'] is not future:
+                return
+            del self._jobs[key]
+
+        print(f"Prefetch for {key[0]} expired unclaimed")
+        if future.cancel():
+            return
+        # Already running: drop the result once it lands
+        future.add_done_callback(self._discard_result)
+
+    def _discard_result(self, future):
+        try:
+            file_path = future.result()
+        except Exception:
+            return
+        print(f"Discarding unclaimed prefetch result: {file_path}")
+        self.downloader.safe_file_cleanup(file_path, delay=0)
+
+prefetcher_instance = None
+
+def get_prefetcher():
+    """Get or create the speculative prefetcher bound to the global downloader"""
+    global prefetcher_instance
+    if prefetcher_instance is None:
+        prefetcher_instance = SpeculativePrefetcher(get_downloader())
+    return prefetcher_instance
+
+class LocalStorageBackend:
+    """
+    Result storage on a local (or shared network) filesystem.
+
+    Pre-signed URLs point back at this service's /results endpoint and are
+    signed with an HMAC of the key, filename and expiry.
+    """
+
+    name = 'local'
+    _KEY_PATTERN = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]+$')
+
+    def __init__(self, root_dir, secret=None, ttl=3600, public_base_url=None):
+        self.root_dir = os.path.abspath(root_dir)
+        Path(self.root_dir).mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        # Behind a reverse proxy the request's own host is the internal bind address
+        self.public_base_url = public_base_url.rstrip('/') if public_base_url else None
+
+        if secret:
+            self.secret = secret.encode('utf-8')
+        else:
+            # Per-process secret: URLs only validate on the node that issued them
+            print("Warning: TWITTER_DOWNLOADER_STORAGE_SECRET not set, using a per-process signing secret")
+            self.secret = os.urandom(32)
+
+        print(f"Using local result storage: {self.root_dir}")
+
+    def _path(self, key):
+        if not self._KEY_PATTERN.fullmatch(key):
+            raise ValueError(f"Invalid storage key: {key}")
+        return Path(self.root_dir) / key
+
+    def stat(self, key):
+        """Return the stored size in bytes, or None if the key is not stored"""
+        path = self._path(key)
+        if not path.is_file():
+            return None
+        return path.stat().st_size
+
+    def put(self, file_path, key):
+        """
+        Move file_path into storage under key.
+
+        A rename when both are on the same filesystem; across devices the file is
+        copied to a partial name first so readers never see an incomplete result.
+        """
+        self._cleanup_expired()
+        path = self._path(key)
+        try:
+            os.replace(file_path, path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+            partial = path.with_name(f"{path.name}.{os.urandom(4).hex()}.part")
+            shutil.copyfile(file_path, partial)
+            os.replace(partial, path)
+            os.remove(file_path)
+
+        # The TTL counts from storing, not from whatever mtime the download had
+        os.utime(path, None)
+
+    def _signature(self, key, filename, expires):
+        message = f"{key}:{filename}:{expires}".encode('utf-8')
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+    def presigned_url(self, key, filename, expires_in):
+        expires = int(time.time()) + int(expires_in)
+        signature = self._signature(key, filename, expires)
+        if self.public_base_url:
+            return self.public_base_url + url_for('download_result', key=key, filename=filename,
+                                                  expires=expires, signature=signature)
+        return url_for('download_result', key=key, filename=filename, expires=expires,
+                       signature=signature, _external=True)
+
+    def verify(self, key, filename, expires, signature):
+        try:
+            expires = int(expires)
+        except (TypeError, ValueError):
+            return False
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self._signature(key, filename, expires), signature or '')
+
+    def local_path(self, key):
+        return str(self._path(key))
+
+    def _cleanup_expired(self):
+        """Remove stored results older than the TTL"""
+        try:
+            cutoff = time.time() - self.ttl
+            for file_path in Path(self.root_dir).iterdir():
+                if file_path.is_file() and file_path.stat().st_mtime < cutoff:
+                    file_path.unlink()
+                    print(f"Expired stored result: {file_path.name}")
+        except Exception as e:
+            print(f"Error cleaning result storage: {e}")
+
+
+class S3StorageBackend:
+    """
+    Result storage in an S3-compatible bucket (AWS S3, MinIO, R2, ...).
+
+    Clients download straight from the bucket with pre-signed GET URLs, so the
+    bytes never pass through the web workers. Expiry of stored results is left
+    to the bucket's lifecycle rules.
+    """
+
+    name = 's3'
+
+    def __init__(self, bucket, prefix='results/', endpoint_url=None, region=None):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise Exception("S3 storage requires boto3. Install it with: pip install boto3")
+
+        self._client_error = ClientError
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client('s3', endpoint_url=endpoint_url, region_name=region)
+
+        print(f"Using S3 result storage: bucket={bucket} prefix={prefix} endpoint={endpoint_url or 'default'}")
+
+    def _object_key(self, key):
+        return f"{self.prefix}{key}"
+
+    def stat(self, key):
+        """Return the stored size in bytes, or None if the key is not stored"""
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self._client_error as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        return head.get('ContentLength')
+
+    def put(self, file_path, key):
+        """Upload file_path under key; the local file is left for the caller to remove"""
+        content_type = 'audio/mp4' if key.endswith('.m4a') else 'video/mp4'
+        self.client.upload_file(file_path, self.bucket, self._object_key(key),
+                                ExtraArgs={'ContentType': content_type})
+
+    def presigned_url(self, key, filename, expires_in):
+        return self.client.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': self.bucket,
+                'Key': self._object_key(key),
+                'ResponseContentDisposition': f'attachment; filename="{filename}"',
+            },
+            ExpiresIn=int(expires_in),
+        )
+
+
+def result_storage_key(tweet_url, video_number, ext='mp4'):
+    """
+    Deterministic storage key so any node can find a result produced by another.
+
+    Quality is left out on purpose: download_with_audio_fix picks formats by
+    availability, so every quality of a video produces the same file.
+    """
+    digest = hashlib.sha256(f"{tweet_url}|{video_number}".encode('utf-8')).hexdigest()
+    return f"{digest}.{ext}"
+
+# Qualities as listed by /extract, e.g. "720p" (or "unknownp" without a height)
+QUALITY_PATTERN = re.compile(r'(\d{2,4}|unknown)p')
+
+storage_instance = None
+storage_configured = False
+
+def get_storage():
+    """
+    Get or create the configured result storage backend, or None if disabled.
+
+    TWITTER_DOWNLOADER_STORAGE selects 'local' or 's3'. Local storage uses
+    TWITTER_DOWNLOADER_STORAGE_DIR, TWITTER_DOWNLOADER_STORAGE_SECRET and
+    TWITTER_DOWNLOADER_PUBLIC_BASE_URL (the external URL of this service);
+    S3 storage uses TWITTER_DOWNLOADER_S3_BUCKET, TWITTER_DOWNLOADER_S3_PREFIX,
+    TWITTER_DOWNLOADER_S3_ENDPOINT (e.g. a MinIO URL) and TWITTER_DOWNLOADER_S3_REGION.
+    """
+    global storage_instance, storage_configured
+    if not storage_configured:
+        storage_configured = True
+        backend = os.environ.get('TWITTER_DOWNLOADER_STORAGE', '').lower()
+
+        if backend == 'local':
+            root_dir = os.environ.get('TWITTER_DOWNLOADER_STORAGE_DIR') or os.path.join(get_downloader().temp_dir, 'results')
+            storage_instance = LocalStorageBackend(
+                root_dir,
+                secret=os.environ.get('TWITTER_DOWNLOADER_STORAGE_SECRET'),
+                ttl=float(os.environ.get('TWITTER_DOWNLOADER_STORAGE_TTL', 3600)),
+                public_base_url=os.environ.get('TWITTER_DOWNLOADER_PUBLIC_BASE_URL') or None,
+            )
+        elif backend == 's3':
+            storage_instance = S3StorageBackend(
+                os.environ['TWITTER_DOWNLOADER_S3_BUCKET'],
+                prefix=os.environ.get('TWITTER_DOWNLOADER_S3_PREFIX', 'results/'),
+                endpoint_url=os.environ.get('TWITTER_DOWNLOADER_S3_ENDPOINT') or None,
+                region=os.environ.get('TWITTER_DOWNLOADER_S3_REGION') or None,
+            )
+        elif backend:
+            print(f"Warning: Unknown storage backend '{backend}', result storage disabled")
+    return storage_instance
+
+def serve_downloaded_file(downloader, file_path, download_name, mimetype='video/mp4'):
+    """
+    Serve a finished file without copying its bytes through Python.
+
+    With an X-Accel-Redirect prefix configured the front proxy (nginx) serves the
+    file and the downloader's cleanup timer removes it once it is older than
+    TWITTER_DOWNLOADER_FILE_MAX_AGE_MINUTES. Otherwise send_file hands the open file
+    to the WSGI server's file wrapper, which gunicorn transmits with os.sendfile.
+    The path is unlinked as soon as the file is open, so the data goes away when
+    the response closes the handle (where the platform refuses to unlink an open
+    file, the cleanup timer removes it instead).
+    """
+    file_size = os.path.getsize(file_path)
+    accel_uri = downloader.accel_redirect_uri(file_path)
+
+    if accel_uri:
+        print(f"Offloading {file_path} ({file_size} bytes) via X-Accel-Redirect: {accel_uri}")
+        response = app.response_class(status=200, mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = accel_uri
+        response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+        return response
+
+    print(f"Streaming {file_path} ({file_size} bytes) via sendfile")
+    file_handle = open(file_path, 'rb')
+    try:
+        os.unlink(file_path)
+    except OSError as e:
+        print(f"Could not unlink {file_path} while serving, leaving it to the cleanup timer: {e}")
+
+    response = send_file(file_handle,
+                         mimetype=mimetype,
+                         as_attachment=True,
+                         download_name=download_name,
+                         conditional=False,
+                         etag=False)
+    response.content_length = file_size
+    return response
+
+def storage_response(storage, storage_key, download_name, file_size, delivery):
+    """Hand out a short-lived pre-signed URL for a stored result, as JSON or as a redirect"""
+    expires_in = int(os.environ.get('TWITTER_DOWNLOADER_URL_EXPIRES', 300))
+    download_url = storage.presigned_url(storage_key, download_name, expires_in)
+
+    if delivery == 'redirect':
+        return redirect(download_url, code=302)
+
+    return jsonify({
+        'success': True,
+        'download_url': download_url,
+        'expires_in': expires_in,
+        'filename': download_name,
+        'file_size': file_size
+    })
+
+def unavailable_response(kind, message, retry_after=None):
+    """JSON error for a classified extraction failure with a matching status code"""
+    status = {
+        'no_media': 404,
+        'private': 403,
+        'gone': 410,
+        'rate_limited': 429,
+        'transient': 503,
+    }.get(kind, 404)
+
+    response = jsonify({'error': message, 'reason': kind})
+    response.status_code = status
+    if retry_after and kind in ('rate_limited', 'transient'):
+        response.headers['Retry-After'] = str(retry_after)
+    return response
+
+class ProfileStore:
+    """
+    Opt-in per-request profiling and storage of the results.
+
+    A request is profiled when it carries the X-Profile-Token header matching
+    TWITTER_DOWNLOADER_PROFILE_TOKEN, or at random with probability
+    TWITTER_DOWNLOADER_PROFILE_SAMPLE_RATE. Each profile is kept as a pstats
+    dump plus a JSON timeline in TWITTER_DOWNLOADER_PROFILE_DIR, newest
+    TWITTER_DOWNLOADER_PROFILE_KEEP only, and downloaded from /admin/profiles.
+    """
+
+    _ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+    def __init__(self, profile_dir, token=None, sample_rate=0.0, keep=50):
+        self.profile_dir = os.path.abspath(profile_dir)
+        self.token = token
+        self.sample_rate = sample_rate
+        self.keep = keep
+
+        if self.token or self.sample_rate > 0:
+            Path(self.profile_dir).mkdir(parents=True, exist_ok=True)
+            print(f"Request profiling available: sample rate {self.sample_rate}, stored in {self.profile_dir}")
+
+    def is_admin(self, req):
+        supplied = req.headers.get('X-Profile-Token', '')
+        # Compare bytes: compare_digest rejects non-ASCII str, and headers arrive as latin-1
+        return bool(self.token) and hmac.compare_digest(supplied.encode('utf-8'), self.token.encode('utf-8'))
+
+    def should_profile(self, req):
+        if self.is_admin(req):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def save(self, profile, status_code):
+        duration_ms = round((time.perf_counter() - profile.started) * 1000, 2)
+        base = Path(self.profile_dir) / profile.id
+        profile.profiler.dump_stats(str(base.with_suffix('.prof')))
+
+        summary = io.StringIO()
+        pstats.Stats(profile.profiler, stream=summary).sort_stats('cumulative').print_stats(30)
+
+        base.with_suffix('.json').write_text(json.dumps({
+            'id': profile.id,
+            'method': profile.method,
+            'path': profile.path,
+            'status': status_code,
+            'started_at': profile.started_at,
+            'duration_ms': duration_ms,
+            'spans': sorted(profile.spans, key=lambda span: span['start_ms']),
+            'summary': summary.getvalue(),
+        }, indent=2))
+
+        print(f"Saved request profile {profile.id} ({profile.method} {profile.path}, {duration_ms} ms)")
+        self._prune()
+
+    def list(self):
+        profiles = []
+        for file_path in sorted(Path(self.profile_dir).glob('*.json'), key=lambda p: p.stat().st_mtime, reverse=True):
+            try:
+                data = json.loads(file_path.read_text())
+            except Exception as e:
+                print(f"Error reading profile {file_path.name}: {e}")
+                continue
+            profiles.append({key: data.get(key) for key in ('id', 'method', 'path', 'status', 'started_at', 'duration_ms')})
+        return profiles
+
+    def path(self, profile_id, suffix):
+        if not self._ID_PATTERN.match(profile_id):
+            return None
+        file_path = Path(self.profile_dir) / f"{profile_id}{suffix}"
+        return str(file_path) if file_path.is_file() else None
+
+    def _prune(self):
+        try:
+            timelines = sorted(Path(self.profile_dir).glob('*.json'), key=lambda p: p.stat().st_mtime, reverse=True)
+            for file_path in timelines[self.keep:]:
+                file_path.unlink()
+                file_path.with_suffix('.prof').unlink(missing_ok=True)
+        except Exception as e:
+            print(f"Error pruning profiles: {e}")
+
+profile_store_instance = None
+
+def get_profile_store():
+    """Get or create the request profile store"""
+    global profile_store_instance
+    if profile_store_instance is None:
+        profile_store_instance = ProfileStore(
+            os.environ.get('TWITTER_DOWNLOADER_PROFILE_DIR') or os.path.join(get_downloader().temp_dir, 'profiles'),
+            token=os.environ.get('TWITTER_DOWNLOADER_PROFILE_TOKEN') or None,
+            sample_rate=float(os.environ.get('TWITTER_DOWNLOADER_PROFILE_SAMPLE_RATE', 0)),
+            keep=int(os.environ.get('TWITTER_DOWNLOADER_PROFILE_KEEP', 50)),
+        )
+    return profile_store_instance
+
+@app.before_request
+def start_request_profile():
+    if request.method == 'OPTIONS' or request.path.startswith('/admin/'):
+        return
+
+    store = get_profile_store()
+    if not store.should_profile(request):
+        return
+
+    profile = RequestProfile(request.method, request.path)
+    try:
+        profile.profiler.enable()
+    except Exception as e:
+        print(f"Could not start request profiler: {e}")
+        return
+
+    _profile_local.current = profile
+    g.request_profile = profile
+
+@app.after_request
+def finish_request_profile(response):
+    profile = g.pop('request_profile', None)
+    if profile is None:
+        return response
+
+    profile.profiler.disable()
+    _profile_local.current = None
+    try:
+        get_profile_store().save(profile, response.status_code)
+        response.headers['X-Profile-Id'] = profile.id
+    except Exception as e:
+        print(f"Error saving request profile: {e}")
+    return response
+
+@app.teardown_request
+def clear_request_profile(error=None):
+    # after_request is skipped on unhandled errors; never leave the profiler running
+    profile = getattr(_profile_local, 'current', None)
+    if profile is not None:
+        profile.profiler.disable()
+        _profile_local.current = None
+
 # Flask routes with improved error handling
 @cross_origin()
 def extract_video():
@@ -528,10 +1868,20 @@ def extract_video():
         video_info = downloader.get_video_info(twitter_url)
 
         if not video_info:
+            failure = downloader.get_failure(twitter_url)
+            if failure:
+                kind, message, expires_at = failure
+                return unavailable_response(kind, message, max(1, int(expires_at - time.time())))
             return jsonify({'error': 'Could not extract video information. The tweet may not contain a video or may be private.'}), 404
 
+        get_prefetcher().schedule(twitter_url, video_info)
+
         return jsonify(video_info)
 
+    except UnavailableVideoError as e:
+        print(f"Extract rejected ({e.kind}): {e}")
+        return unavailable_response(e.kind, str(e), e.retry_after)
+
     except Exception as e:
         print(f"Extract video error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -551,12 +1901,60 @@ def download_with_audio():
         twitter_url = data.get('url', '').strip()
         quality = data.get('quality', '360p')
         video_number = data.get('video_number', 1)
+        # 'base64' (default, used by the WordPress plugin), 'file' for a raw streamed body,
+        # 'url' for a pre-signed storage URL or 'redirect' for a redirect to that URL
+        delivery = data.get('delivery', 'base64')
+        # 'video' (default) or 'audio' for the soundtrack only as M4A
+        mode = data.get('mode', 'video')
 
         if not twitter_url:
             return jsonify({'error': 'Twitter URL is required'}), 400
 
+        if delivery not in ('base64', 'file', 'url', 'redirect'):
+            return jsonify({'error': 'Invalid delivery mode'}), 400
+
+        if mode not in ('video', 'audio'):
+            return jsonify({'error': 'Invalid mode'}), 400
+
+        # Both end up in file names, Content-Disposition and signed URLs
+        if not isinstance(quality, str) or not QUALITY_PATTERN.fullmatch(quality):
+            return jsonify({'error': 'Invalid quality'}), 400
+
+        try:
+            video_number = int(video_number)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid video number'}), 400
+
+        if mode == 'audio':
+            quality = 'audio'
+            download_name = f"twitter_audio_{video_number}.m4a"
+            mimetype = 'audio/mp4'
+        else:
+            download_name = f"twitter_video_audio_{video_number}_{quality}.mp4"
+            mimetype = 'video/mp4'
+
+        storage = None
+        storage_key = None
+        if delivery in ('url', 'redirect'):
+            storage = get_storage()
+            if storage is None:
+                return jsonify({'error': 'Result storage is not configured'}), 400
+
+            # Any node may already have produced this result
+            storage_key = result_storage_key(twitter_url, video_number,
+                                             ext='m4a' if mode == 'audio' else 'mp4')
+            stored_size = storage.stat(storage_key)
+            if stored_size:
+                print(f"Serving stored result {storage_key} ({stored_size} bytes)")
+                return storage_response(storage, storage_key, download_name, stored_size, delivery)
+
         downloader = get_downloader()
-        downloaded_file = downloader.download_with_audio_fix(twitter_url, quality, video_number)
+        if mode == 'audio':
+            downloaded_file = downloader.download_audio_only(twitter_url, video_number)
+        else:
+            downloaded_file = get_prefetcher().claim(twitter_url, video_number)
+            if not downloaded_file:
+                downloaded_file = downloader.download_with_audio_fix(twitter_url, quality, video_number)
 
         if not downloaded_file or not os.path.exists(downloaded_file):
             return jsonify({'error': 'Failed to download video'}), 500
@@ -566,11 +1964,25 @@ def download_with_audio():
         if file_size == 0:
             return jsonify({'error': 'Downloaded file is empty'}), 500
 
+        if storage is not None:
+            print(f"Uploading {downloaded_file} to {storage.name} storage as {storage_key}")
+            with profile_span('storage_upload'):
+                storage.put(downloaded_file, storage_key)
+            downloader.safe_file_cleanup(downloaded_file, delay=0)
+            downloaded_file = None
+            return storage_response(storage, storage_key, download_name, file_size, delivery)
+
+        if delivery == 'file':
+            response = serve_downloaded_file(downloader, downloaded_file, download_name, mimetype)
+            # The file now belongs to the response (or the front proxy)
+            downloaded_file = None
+            return response
+
         print(f"Reading file: {downloaded_file} ({file_size} bytes)")
 
         # Read the file with error handling
         try:
-            with open(downloaded_file, 'rb') as f:
+            with profile_span('read_file'), open(downloaded_file, 'rb') as f:
                 video_data = f.read()
         except Exception as e:
             print(f"Error reading downloaded file: {e}")
@@ -582,15 +1994,14 @@ def download_with_audio():
         # Return base64-encoded data for WordPress plugin
         import base64
         try:
-            encoded_data = base64.b64encode(video_data).decode('utf-8')
+            with profile_span('base64_encode'):
+                encoded_data = base64.b64encode(video_data).decode('utf-8')
             print(f"Base64 encoding successful. Original size: {len(video_data)}, Encoded length: {len(encoded_data)}")
             print(f"Base64 data starts with: {encoded_data[:50]}")
         except Exception as e:
             print(f"Error encoding video data: {e}")
             return jsonify({'error': 'Could not encode video data'}), 500
 
-        download_name = f"twitter_video_audio_{video_number}_{quality}.mp4"
-
         # Clean up the temporary file AFTER successful encoding
         downloader.safe_file_cleanup(downloaded_file)
 
@@ -604,6 +2015,10 @@ def download_with_audio():
         print(f"Sending response with file_size: {len(video_data)}")
         return jsonify(response_data)
 
+    except UnavailableVideoError as e:
+        print(f"Download rejected ({e.kind}): {e}")
+        return unavailable_response(e.kind, str(e), e.retry_after)
+
     except Exception as e:
         print(f"Download error: {e}")
         # Clean up file if there was an error
@@ -624,6 +2039,61 @@ def handle_extract_video():
 def handle_download_with_audio():
     return download_with_audio()
 
+@app.route('/results/<key>', methods=['GET'])
+def download_result(key):
+    """Serve a locally stored result behind a pre-signed URL"""
+    storage = get_storage()
+    if not isinstance(storage, LocalStorageBackend):
+        abort(404)
+
+    filename = request.args.get('filename', '')
+    if not storage.verify(key, filename, request.args.get('expires'), request.args.get('signature')):
+        abort(403)
+
+    try:
+        file_path = storage.local_path(key)
+    except ValueError:
+        abort(404)
+
+    if not os.path.isfile(file_path):
+        abort(404)
+
+    mimetype = 'audio/mp4' if key.endswith('.m4a') else 'video/mp4'
+    return send_file(file_path, mimetype=mimetype, as_attachment=True, download_name=filename)
+
+@app.route('/admin/profiles', methods=['GET'])
+def list_profiles():
+    """List stored request profiles (requires X-Profile-Token)"""
+    store = get_profile_store()
+    if not store.is_admin(request):
+        abort(404)
+    return jsonify({'profiles': store.list()})
+
+@app.route('/admin/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """Span timeline and top functions of a profile (requires X-Profile-Token)"""
+    store = get_profile_store()
+    if not store.is_admin(request):
+        abort(404)
+
+    file_path = store.path(profile_id, '.json')
+    if not file_path:
+        abort(404)
+    return send_file(file_path, mimetype='application/json')
+
+@app.route('/admin/profiles/<profile_id>/pstats', methods=['GET'])
+def download_profile(profile_id):
+    """Raw cProfile dump for snakeviz/pstats (requires X-Profile-Token)"""
+    store = get_profile_store()
+    if not store.is_admin(request):
+        abort(404)
+
+    file_path = store.path(profile_id, '.prof')
+    if not file_path:
+        abort(404)
+    return send_file(file_path, mimetype='application/octet-stream',
+                     as_attachment=True, download_name=f"{profile_id}.prof")
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint with disk space info"""
@@ -632,12 +2102,21 @@ def health_check():
         stat = shutil.disk_usage(downloader.temp_dir)
         free_mb = stat.free / (1024 * 1024)
 
-        return jsonify({
+        health = {
             'status': 'healthy',
             'service': 'twitter-video-downloader',
             'temp_dir': downloader.temp_dir,
             'free_space_mb': round(free_mb, 1)
-        })
+        }
+
+        health['upstream'] = downloader.governor.status()
+
+        if downloader.staging_dir:
+            health['staging_dir'] = downloader.staging_dir
+            health['staging_used_mb'] = round(downloader._dir_usage_bytes(downloader.staging_dir) / (1024 * 1024), 1)
+            health['staging_max_mb'] = round(downloader.staging_max_bytes / (1024 * 1024), 1)
+
+        return jsonify(health)
     except Exception as e:
         return jsonify({
             'status': 'unhealthy',